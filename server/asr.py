@@ -0,0 +1,10 @@
+from keys import ASR_BACKEND
+
+# Единственное место выбора ASR-бэкенда: task_0 (transformers, GPU), task_0_cpu (CTranslate2 int8)
+# или task_0_remote (ASR-узлы asr_node.py)
+if ASR_BACKEND == "cpu_int8":
+    from task_0_cpu import transcribe_audio, transcribe_samples
+elif ASR_BACKEND == "remote":
+    from task_0_remote import transcribe_audio, transcribe_samples
+else:
+    from task_0 import transcribe_audio, transcribe_samples
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import tempfile
+
+import numpy as np
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+
+from asr import transcribe_audio, transcribe_samples
+from keys import allowed_extensions
+
+# ASR-only server for GPU-less nodes: imports the Whisper backend only, no LLM.
+# Run with ASR_BACKEND=cpu_int8: uvicorn asr_node:app --host 0.0.0.0 --port 8001
+app = FastAPI()
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/transcribe")
+def transcribe(file: UploadFile = File(...), beam_size: int | None = Form(None)):
+    file_extension = os.path.splitext(file.filename)[1]
+    if file_extension.lower() not in allowed_extensions:
+        raise HTTPException(status_code=400, detail=f"Unsupported file format. Allowed formats: {allowed_extensions}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        audio_path = os.path.join(work_dir, f"audio{file_extension}")
+        transcript_path = os.path.join(work_dir, "audio.txt")
+        transcript_path_t = os.path.join(work_dir, "audio.timestamp.txt")
+        with open(audio_path, "wb") as f:
+            f.write(file.file.read())
+
+        if beam_size:
+            transcribe_audio(audio_path, transcript_path, transcript_path_t, beam_size=beam_size)
+        else:
+            transcribe_audio(audio_path, transcript_path, transcript_path_t)
+        # transcribe_audio only prints its errors
+        if not os.path.exists(transcript_path) or not os.path.exists(transcript_path_t):
+            raise HTTPException(status_code=500, detail="Transcription failed")
+
+        with open(transcript_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        with open(transcript_path_t, "r", encoding="utf-8") as f:
+            timestamps = f.read()
+    return {"text": text, "timestamps": timestamps}
+
+
+@app.post("/transcribe-samples")
+async def transcribe_raw_samples(request: Request, sampling_rate: int = 16000):
+    """Body: mono float32 little-endian samples, used by the live stream of the main server."""
+    body = await request.body()
+    if len(body) % 4:
+        raise HTTPException(status_code=400, detail="Body must be float32 samples")
+    samples = np.frombuffer(body, dtype="<f4").copy()
+    segments = await asyncio.to_thread(transcribe_samples, samples, sampling_rate)
+    return {"segments": segments}
@@ -4,13 +4,15 @@ import soundfile as sf
 import uuid
 from fastapi import FastAPI, File, UploadFile, BackgroundTasks, HTTPException, WebSocket, WebSocketDisconnect, \
     WebSocketException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from chat_bot import chat_with_deepseek
+from task_0_stream import StreamingTranscriber, InvalidAudioError
 from pydantic import BaseModel
 
 from assistant_background import (run_full_analysis_pipeline, chunk_file,
                                   run_transcript_chunk_pipeline)
 from keys import UPLOAD_DIR, allowed_extensions, RESULT_TYPES
+from transcript_index import index_path_for, find_byte_range, iter_file_range, StaleIndexError
 
 app = FastAPI()
 
@@ -107,7 +109,11 @@ async def start_analysis(session_id: str, background_tasks: BackgroundTasks = No
 
 
 @app.get("/{session_id}/download")
-async def download_result(session_id: str, type: str = "transcript"):
+async def download_result(session_id: str, type: str = "transcript", start: float | None = None,
+                          end: float | None = None):
+    if start is not None or end is not None:
+        return download_transcript_range(session_id, type, start, end)
+
     if type not in RESULT_TYPES:
         file_path = os.path.join(UPLOAD_DIR, f"{session_id}_custom_{type}.txt")
         if not os.path.exists(file_path):
@@ -123,6 +129,32 @@ async def download_result(session_id: str, type: str = "transcript"):
     return FileResponse(path=file_path, media_type="text/plain", filename=filename)
 
 
+def download_transcript_range(session_id: str, type: str, start: float | None, end: float | None):
+    if type != "transcript":
+        raise HTTPException(status_code=400, detail="Time range is supported only for transcript.")
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be less than end.")
+
+    file_path = os.path.join(UPLOAD_DIR, f"{session_id}.timestamp.txt")
+    index_path = index_path_for(file_path)
+    if not os.path.exists(file_path) or not os.path.exists(index_path):
+        raise HTTPException(status_code=404, detail="Requested result not found yet. Try again later.")
+
+    # The handle pins this version of the transcript even if a re-merge replaces the file meanwhile
+    transcript_file = open(file_path, "rb")
+    try:
+        offset, length = find_byte_range(transcript_file, index_path, start, end)
+    except StaleIndexError:
+        transcript_file.close()
+        raise HTTPException(status_code=503, detail="Transcript is being rebuilt. Try again later.")
+    except Exception:
+        transcript_file.close()
+        raise
+    return StreamingResponse(iter_file_range(transcript_file, offset, length), media_type="text/plain",
+                             headers={"Content-Length": str(length),
+                                      "Content-Disposition": 'attachment; filename="transcription.timestamp.txt"'})
+
+
 @app.get("/{session_id}/status")
 async def get_status(session_id: str):
     result_types = list(RESULT_TYPES.keys())
@@ -163,3 +195,74 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     except WebSocketException as e:
         await websocket.close(code=1003)
         print(f"WebSocket exception: {e}")
+
+
+@app.websocket("/ws/{session_id}/stream")
+async def stream_endpoint(websocket: WebSocket, session_id: str, format: str = "pcm"):
+    """Live transcription: binary frames are PCM s16le mono 16 kHz (or Opus with ?format=opus),
+    the text frame "end" flushes the remaining audio and closes the stream."""
+    await websocket.accept()
+    api_key = websocket.headers.get("x-api-key")
+    # if api_key != os.getenv("API_KEY"):
+    if api_key != "test-api-key":
+        await websocket.close(code=1008)  # Policy Violation
+        print(f"Unauthorized WebSocket connection attempt for session: {session_id}")
+        return
+    if format not in ("pcm", "opus"):
+        await websocket.close(code=1003)
+        return
+
+    try:
+        transcriber = StreamingTranscriber(session_id, format)
+    except InvalidAudioError as e:
+        await websocket.close(code=1003)  # Unsupported data
+        print(f"Stream rejected for session {session_id}: {e}")
+        return
+    new_audio = asyncio.Event()
+    stopping = False
+
+    async def decode_loop():
+        # One decode at a time; frames received meanwhile are merged into the next pass
+        while not stopping:
+            await new_audio.wait()
+            new_audio.clear()
+            if stopping or not transcriber.has_pending():
+                continue
+            for event in await asyncio.to_thread(transcriber.decode_pending):
+                await websocket.send_json(event)
+
+    decoder = asyncio.create_task(decode_loop())
+    try:
+        while True:
+            message = await websocket.receive()
+            if decoder.done():
+                decoder.result()  # re-raises a failed decode
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                transcriber.feed(message["bytes"])
+                new_audio.set()
+            elif message.get("text") == "end":
+                # Let a running decode send its events, then flush the rest
+                stopping = True
+                new_audio.set()
+                await decoder
+                for event in await asyncio.to_thread(transcriber.close):
+                    await websocket.send_json(event)
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        print(f"Stream disconnected: {session_id}")
+    except InvalidAudioError as e:
+        await websocket.close(code=1003)  # Unsupported data
+        print(f"Stream rejected audio frame: {e}")
+    except WebSocketException as e:
+        await websocket.close(code=1003)
+        print(f"WebSocket exception: {e}")
+    except Exception as e:
+        # ASR failures re-raised from the decode task are server errors, not bad client audio
+        await websocket.close(code=1011)  # Internal Error
+        print(f"Stream transcription failed for session {session_id}: {e}")
+    finally:
+        decoder.cancel()
+        await asyncio.to_thread(transcriber.close)
@@ -1,7 +1,9 @@
 import os
 
+from asr import transcribe_audio
 from keys import UPLOAD_DIR, allowed_extensions
-from task_0 import transcribe_audio
+from transcript_index import merge_timestamp_chunks, index_path_for
+from transcript_search import build_search_index
 from task_1 import (summarize_transcript, extract_decisions_from_transcript, extract_tasks_from_transcript,
                     analyze_with_custom_prompt)
 
@@ -13,6 +15,14 @@ def chunk_file(session_id: str, chunk_index: int, file_extension: str):
     return os.path.join(session_dir, chunk_filename)
 
 
+def find_chunk_audio(session_dir: str, chunk_name: str):
+    for ext in allowed_extensions:
+        audio_path_candidate = os.path.join(session_dir, chunk_name + ext)
+        if os.path.exists(audio_path_candidate):
+            return audio_path_candidate
+    return None
+
+
 def run_transcript_chunk_pipeline(session_id: str, chunk_index: int):
     for ext in allowed_extensions:
         audio_path_candidate = chunk_file(session_id, chunk_index, ext)
@@ -61,15 +71,24 @@ def run_full_analysis_pipeline(session_id: str, prompts: dict = None):
                 with open(os.path.join(session_dir, chunk_file), "r", encoding="utf-8") as infile:
                     outfile.write(infile.read() + "\n")
 
-        # Merge all timestamp transcripts into a single timestamp file
+        # Merge all timestamp transcripts onto a global timeline and index segments by time
         timestamp_path_t = os.path.join(UPLOAD_DIR, f"{session_id}.timestamp.txt")
-        with open(timestamp_path_t, "w", encoding="utf-8") as outfile:
-            for chunk_file in sorted(
-                f for f in os.listdir(session_dir)
-                if f.endswith(".timestamp.txt")
-            ):
-                with open(os.path.join(session_dir, chunk_file), "r", encoding="utf-8") as infile:
-                    outfile.write(infile.read() + "\n")
+        # Chunks without a transcript still shift the timeline by their audio duration
+        chunk_names = sorted({
+            os.path.splitext(f)[0] for f in os.listdir(session_dir)
+            if os.path.splitext(f)[1].lower() in allowed_extensions
+        } | {os.path.splitext(f)[0] for f in chunk_files})
+        merge_timestamp_chunks(
+            [(os.path.join(session_dir, name + ".timestamp.txt"), find_chunk_audio(session_dir, name))
+             for name in chunk_names],
+            timestamp_path_t,
+            index_path_for(timestamp_path_t)
+        )
+        # Retrieval index for the session chat; the analysis does not depend on it
+        try:
+            build_search_index(session_id, timestamp_path_t)
+        except Exception as e:
+            print(f"Search index build failed: {e}")
 
         # 2. Generate meeting summary
         summarize_transcript(session_id, transcript_path)
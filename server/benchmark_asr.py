@@ -0,0 +1,72 @@
+"""Real-time factor of the CPU ASR backends.
+
+RTF = processing time / audio duration, lower is better (RTF < 1 is faster than real time).
+
+    python benchmark_asr.py [--beam-size N] meeting.wav [more.wav ...]
+
+Both backends decode with the same beam size (default 1, greedy, like task_0 in production),
+so the speedup reflects the backend and quantization only.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# The baseline is the current fallback path: task_0 on CPU in float32
+os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+import soundfile as sf
+
+from keys import ASR_CPU_WORKERS
+
+
+def run(transcribe_audio, audio_paths: list, out_dir: str, beam_size: int, workers: int = 1) -> float:
+    def job(i_path):
+        i, path = i_path
+        base = os.path.join(out_dir, f"{i:06d}")
+        outputs = [base + ".txt", base + ".timestamp.txt"]
+        for output in outputs:
+            if os.path.exists(output):
+                os.remove(output)
+        transcribe_audio(path, *outputs, beam_size=beam_size)
+        # transcribe_audio only prints its errors, a failed run would look like a fast one
+        for output in outputs:
+            if not os.path.exists(output) or not os.path.getsize(output):
+                raise RuntimeError(f"Transcription of {path} produced no {os.path.basename(output)}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(job, enumerate(audio_paths)))
+    return time.perf_counter() - started
+
+
+def main(audio_paths: list, beam_size: int = 1):
+    audio_seconds = sum(sf.info(path).duration for path in audio_paths)
+    print(f"Audio: {len(audio_paths)} files, {audio_seconds:.1f} s, beam size {beam_size}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        from task_0 import transcribe_audio as transcribe_float32
+        elapsed = run(transcribe_float32, audio_paths, out_dir, beam_size)
+        results.append(("transformers float32, 1 worker", elapsed))
+
+        from task_0_cpu import transcribe_audio as transcribe_int8
+        elapsed = run(transcribe_int8, audio_paths, out_dir, beam_size)
+        results.append(("ctranslate2 int8, 1 worker", elapsed))
+        if ASR_CPU_WORKERS > 1 and len(audio_paths) > 1:
+            elapsed = run(transcribe_int8, audio_paths, out_dir, beam_size, workers=ASR_CPU_WORKERS)
+            results.append((f"ctranslate2 int8, {ASR_CPU_WORKERS} workers", elapsed))
+
+    baseline = results[0][1]
+    for name, elapsed in results:
+        print(f"{name:<36} beam {beam_size}  {elapsed:8.1f} s  RTF {elapsed / audio_seconds:.3f}  "
+              f"speedup x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--beam-size", type=int, default=1)
+    parser.add_argument("audio", nargs="+")
+    args = parser.parse_args()
+    main(args.audio, args.beam_size)
@@ -0,0 +1,110 @@
+"""Latency and recall of the session transcript retrieval index.
+
+    python benchmark_search.py <session_id> [questions.tsv] [queries]
+
+Two recall numbers are reported, each for whole-word terms and for TERM_PREFIX-normalized terms:
+
+- Inflected queries: a few content words of a random passage, each put into another word form
+  (ending replaced, e.g. "задача" -> "задачами"). Recall@k is the share of queries whose source
+  passage is in the top k. This only measures robustness to inflection: the words are still taken
+  from the passage, so it is an upper bound for real questions, which use synonyms and paraphrases.
+- Questions (optional questions.tsv, lines "<seconds>\\t<question>"): real questions about the meeting,
+  a hit is a top-k passage covering the given moment of the meeting. This is the number to trust.
+"""
+import os
+import random
+import sys
+import time
+
+from keys import UPLOAD_DIR
+from transcript_search import build_search_index, load_search_index, loaded_indexes, search, WORD, TERM_PREFIX
+
+TOP_K = (1, 3, 8)
+WORDS_PER_QUERY = 4
+CYRILLIC_ENDINGS = ["а", "у", "ы", "ой", "ами", "ов", "ом", "ие", "ей"]
+LATIN_ENDINGS = ["s", "es", "ed", "ing", "ion"]
+
+
+def inflect(word: str, rng: random.Random) -> str:
+    stem = word[:-2] if len(word) > 6 else word[:-1]
+    endings = CYRILLIC_ENDINGS if "а" <= word[0] <= "я" else LATIN_ENDINGS
+    return stem + rng.choice(endings)
+
+
+def inflected_queries(passages: list, count: int) -> list:
+    """[(query, passage)] with query words taken from the passage in another word form."""
+    rng = random.Random(0)
+    queries = []
+    for _ in range(count):
+        passage = passages[rng.randrange(len(passages))]
+        words = [w for w in WORD.findall(passage[2].lower()) if len(w) >= 5 and not w.isdigit()]
+        if not words:
+            continue
+        sampled = rng.sample(words, min(WORDS_PER_QUERY, len(words)))
+        queries.append((" ".join(inflect(w, rng) for w in sampled), passage))
+    return queries
+
+
+def read_questions(path: str) -> list:
+    questions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                seconds, question = line.rstrip("\n").split("\t", 1)
+                questions.append((question, float(seconds)))
+    return questions
+
+
+def recall(index: dict, queries: list, is_hit) -> tuple:
+    latencies = []
+    hits = {k: 0 for k in TOP_K}
+    for query, expected in queries:
+        started = time.perf_counter()
+        results = search(index, query, max(TOP_K))
+        latencies.append(time.perf_counter() - started)
+        for k in TOP_K:
+            hits[k] += any(is_hit(passage, expected) for passage in results[:k])
+    latencies.sort()
+    return {k: hits[k] / len(queries) for k in TOP_K}, latencies
+
+
+def main(session_id: str, questions_path: str | None = None, queries: int = 200):
+    timestamp_path = os.path.join(UPLOAD_DIR, f"{session_id}.timestamp.txt")
+    questions = read_questions(questions_path) if questions_path else []
+
+    # Whole words first, the normalized index is built last and stays on disk for the chat
+    for term_prefix in (None, TERM_PREFIX):
+        label = f"prefix {term_prefix}" if term_prefix else "whole words"
+        started = time.perf_counter()
+        build_search_index(session_id, timestamp_path, term_prefix)
+        build_seconds = time.perf_counter() - started
+        loaded_indexes.pop(session_id, None)  # cold load
+        started = time.perf_counter()
+        index = load_search_index(session_id)
+        load_seconds = time.perf_counter() - started
+
+        passages = index["passages"]
+        if not passages:
+            print("Transcript is empty.")
+            return
+        print(f"[{label}] passages: {len(passages)}, transcript {passages[-1][1] / 60:.1f} min, "
+              f"build {build_seconds * 1000:.1f} ms, load {load_seconds * 1000:.1f} ms")
+
+        runs = [("inflected", inflected_queries(passages, queries), lambda passage, source: passage == source)]
+        if questions:
+            runs.append(("questions", questions, lambda passage, seconds: passage[0] <= seconds <= passage[1]))
+        for name, run_queries, is_hit in runs:
+            if not run_queries:
+                continue
+            hits, latencies = recall(index, run_queries, is_hit)
+            print(f"  {name:<10} n={len(run_queries):<4} "
+                  + "  ".join(f"recall@{k} {hits[k]:.3f}" for k in TOP_K)
+                  + f"  p50 {latencies[len(latencies) // 2] * 1000:.2f} ms"
+                  + f"  p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None, *map(int, sys.argv[3:4]))
@@ -1,6 +1,11 @@
 from deepseek.deepseek_r1_32b import model, tokenizer
+from transcript_search import retrieve_context
 import torch
 
+# Transcript excerpts injected per message: prefill stays bounded however long the meeting is
+CONTEXT_TOKEN_BUDGET = 1024
+CONTEXT_TOP_K = 8
+
 # Истории диалогов по пользователям
 user_histories = {}
 
@@ -15,8 +20,16 @@ def chat_with_deepseek(prompt, user_id, max_new_tokens=512):
     history = user_histories[user_id]
     history.append({"role": "user", "content": prompt})
 
+    # Relevant parts of the meeting go right after the system prompt, only for this turn
+    context = retrieve_context(user_id, prompt, lambda text: len(tokenizer(text).input_ids),
+                               CONTEXT_TOKEN_BUDGET, CONTEXT_TOP_K)
+    turns = history
+    if context:
+        turns = history[:1] + [{"role": "system",
+                                "content": "Фрагменты транскрипта встречи:\n" + context}] + history[1:]
+
     input_text = ""
-    for turn in history:
+    for turn in turns:
         input_text += f"{turn['role']}: {turn['content']}\n"
     input_text += "assistant:"
 
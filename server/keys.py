@@ -12,3 +12,12 @@ RESULT_TYPES = {
     "decisions": "_decisions",
     "ready": "_ready"
 }
+
+# ASR backend: "transformers" (task_0, GPU), "cpu_int8" (task_0_cpu, CTranslate2 int8 on CPU)
+# or "remote" (task_0_remote, sends audio to asr_node servers listed in ASR_NODE_URLS)
+ASR_BACKEND = os.getenv("ASR_BACKEND", "transformers")
+ASR_NODE_URLS = [url.strip().rstrip("/") for url in os.getenv("ASR_NODE_URLS", "").split(",") if url.strip()]
+ASR_CPU_MODEL = os.getenv("ASR_CPU_MODEL", "large-v3-turbo")
+ASR_CPU_WORKERS = int(os.getenv("ASR_CPU_WORKERS", "2"))
+# Threads per worker (CTranslate2 replica): threads x workers should not exceed the cores
+ASR_CPU_THREADS = int(os.getenv("ASR_CPU_THREADS", str(max(1, (os.cpu_count() or 4) // ASR_CPU_WORKERS))))
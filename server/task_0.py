@@ -33,10 +33,10 @@ pipe = pipeline(
 model_lock = threading.Lock()
 
 
-def transcribe_audio(input_path: str, output_path: str, output_path_t: str):
+def transcribe_audio(input_path: str, output_path: str, output_path_t: str, beam_size: int = 1):
     try:
         with model_lock:
-            result = pipe(input_path, return_timestamps=True)
+            result = pipe(input_path, return_timestamps=True, generate_kwargs={"num_beams": beam_size})
 
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(result["text"])
@@ -55,3 +55,10 @@ def transcribe_audio(input_path: str, output_path: str, output_path_t: str):
     finally:
         torch.cuda.empty_cache()
         gc.collect()
+
+
+def transcribe_samples(samples, sampling_rate: int = 16000) -> list:
+    """Transcribes an in-memory mono float32 buffer, returns [(start, end, text)] relative to its start."""
+    with model_lock:
+        result = pipe({"raw": samples, "sampling_rate": sampling_rate}, return_timestamps=True)
+    return [(chunk["timestamp"][0], chunk["timestamp"][1], chunk["text"]) for chunk in result["chunks"]]
@@ -0,0 +1,51 @@
+import gc
+import os
+import threading
+from faster_whisper import WhisperModel
+
+from keys import ASR_CPU_MODEL, ASR_CPU_THREADS, ASR_CPU_WORKERS
+
+# Whisper, экспортированный в CTranslate2, с int8-квантизацией весов — для серверов без GPU
+print(f"start loading model {ASR_CPU_MODEL} (int8, {ASR_CPU_WORKERS} workers x {ASR_CPU_THREADS} threads)")
+if ASR_CPU_WORKERS * ASR_CPU_THREADS > (os.cpu_count() or 1):
+    print(f"Warning: {ASR_CPU_WORKERS} workers x {ASR_CPU_THREADS} threads oversubscribe {os.cpu_count()} cores")
+model = WhisperModel(
+    ASR_CPU_MODEL,
+    device="cpu",
+    compute_type="int8",
+    cpu_threads=ASR_CPU_THREADS,
+    num_workers=ASR_CPU_WORKERS
+)
+print(f"end loading model {ASR_CPU_MODEL}")
+
+# Up to ASR_CPU_WORKERS chunks are transcribed in parallel, the rest wait here
+workers = threading.BoundedSemaphore(ASR_CPU_WORKERS)
+
+
+def transcribe_audio(input_path: str, output_path: str, output_path_t: str, beam_size: int = 5):
+    try:
+        with workers:
+            segments, info = model.transcribe(input_path, beam_size=beam_size)
+            # segments is a lazy generator, decoding happens while iterating
+            segments = list(segments)
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write("".join(segment.text for segment in segments))
+
+        # Save transcription with timestamps in a separate file
+        with open(output_path_t, "w", encoding="utf-8") as ts_f:
+            for segment in segments:
+                ts_f.write(f"[{segment.start:.2f} - {segment.end:.2f}]: {segment.text}\n")
+        print(f"Transcription finished")
+    except Exception as e:
+        print(f"Transcription failed: {e}")
+    finally:
+        gc.collect()
+
+
+def transcribe_samples(samples, sampling_rate: int = 16000) -> list:
+    """Transcribes an in-memory mono float32 buffer, returns [(start, end, text)] relative to its start."""
+    with workers:
+        # Greedy decoding: the live stream re-decodes its window every step, latency matters more than beam search
+        segments, info = model.transcribe(samples, beam_size=1)
+        return [(segment.start, segment.end, segment.text) for segment in segments]
@@ -0,0 +1,58 @@
+import itertools
+import os
+import threading
+
+import numpy as np
+import requests
+
+from keys import ASR_NODE_URLS
+
+if not ASR_NODE_URLS:
+    raise RuntimeError("ASR_BACKEND=remote needs ASR_NODE_URLS, e.g. http://10.0.0.5:8001,http://10.0.0.6:8001")
+
+ASR_NODE_TIMEOUT_S = 600
+ASR_NODE_SAMPLES_TIMEOUT_S = 60
+
+# Chunks are spread over the ASR nodes round-robin
+nodes = itertools.cycle(ASR_NODE_URLS)
+nodes_lock = threading.Lock()
+
+
+def next_node() -> str:
+    with nodes_lock:
+        return next(nodes)
+
+
+def transcribe_audio(input_path: str, output_path: str, output_path_t: str, beam_size: int | None = None):
+    try:
+        node = next_node()
+        with open(input_path, "rb") as audio:
+            response = requests.post(
+                f"{node}/transcribe",
+                files={"file": (os.path.basename(input_path), audio)},
+                data={"beam_size": beam_size} if beam_size else None,
+                timeout=ASR_NODE_TIMEOUT_S
+            )
+        response.raise_for_status()
+        result = response.json()
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(result["text"])
+        # The node returns the .timestamp.txt content as is
+        with open(output_path_t, "w", encoding="utf-8") as ts_f:
+            ts_f.write(result["timestamps"])
+        print(f"Transcription finished on {node}")
+    except Exception as e:
+        print(f"Transcription failed: {e}")
+
+
+def transcribe_samples(samples, sampling_rate: int = 16000) -> list:
+    """Transcribes an in-memory mono float32 buffer, returns [(start, end, text)] relative to its start."""
+    response = requests.post(
+        f"{next_node()}/transcribe-samples",
+        params={"sampling_rate": sampling_rate},
+        data=np.asarray(samples, dtype="<f4").tobytes(),
+        timeout=ASR_NODE_SAMPLES_TIMEOUT_S
+    )
+    response.raise_for_status()
+    return [tuple(segment) for segment in response.json()["segments"]]
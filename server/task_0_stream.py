@@ -0,0 +1,166 @@
+import os
+import re
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from asr import transcribe_samples
+from keys import UPLOAD_DIR
+
+SAMPLE_RATE = 16000
+OPUS_MAX_FRAME_SAMPLES = SAMPLE_RATE * 120 // 1000
+
+# Minimum new audio before the sliding window is decoded again. The real step is
+# max(STEP_S, decode time): audio received while a decode runs is merged into the next one.
+#
+# Latency guarantee: a word reaches a partial event at most STEP_S + 2 * D after it is received,
+# where D is the decode time of one window (at most WINDOW_S of audio) including the wait for the
+# shared ASR lock. This holds while D < WINDOW_S, i.e. the backend runs faster than real time on a
+# window; otherwise the backlog grows and the stream falls behind.
+# Segments are finalized at most MAX_BUFFER_S (while speech continues: WINDOW_S) of audio after
+# their start, plus the same decode delay.
+STEP_S = 1.0
+# Segments ending this close to the live edge may still change, they stay partial
+FINALIZE_MARGIN_S = 2.0
+# Above this everything but the last segment is finalized
+MAX_BUFFER_S = 15.0
+# Whisper window, the buffer is never decoded beyond it
+WINDOW_S = 28.0
+
+CHUNK_NAME = re.compile(r"^chunk_(\d{6})\.")
+
+
+class InvalidAudioError(Exception):
+    """Audio the stream cannot accept: a broken frame or a format this server cannot decode."""
+
+
+def next_chunk_index(session_dir: str) -> int:
+    indexes = [int(m.group(1)) for m in map(CHUNK_NAME.match, os.listdir(session_dir)) if m]
+    return max(indexes) + 1 if indexes else 0
+
+
+class StreamingTranscriber:
+    """Sliding-window ASR over a live audio stream of one session.
+
+    The stream is stored as the next chunk of the session (chunk_NNNNNN.wav/.txt/.timestamp.txt),
+    finalized segments are appended to its transcript files, so run_full_analysis_pipeline merges
+    it like an uploaded chunk.
+    """
+
+    def __init__(self, session_id: str, audio_format: str = "pcm"):
+        session_dir = os.path.join(UPLOAD_DIR, session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        chunk_base = os.path.join(session_dir, f"chunk_{next_chunk_index(session_dir):06d}")
+
+        self.decoder = None
+        if audio_format == "opus":
+            try:
+                # opuslib needs the system libopus (libopus0) and fails at import without it
+                import opuslib
+                self.decoder = opuslib.Decoder(SAMPLE_RATE, 1)
+            except Exception as e:
+                raise InvalidAudioError(f"Opus is not supported on this server: {e}")
+
+        self.audio_file = sf.SoundFile(chunk_base + ".wav", "w", samplerate=SAMPLE_RATE, channels=1,
+                                       subtype="PCM_16")
+        self.transcript_path = chunk_base + ".txt"
+        self.timestamp_path = chunk_base + ".timestamp.txt"
+        open(self.transcript_path, "w").close()
+        open(self.timestamp_path, "w").close()
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0.0  # seconds from the stream start
+        self.pending = 0
+        self.remainder = b""
+        self.closed = False
+        # feed() runs on the event loop while decode() runs in a worker thread
+        self.buffer_lock = threading.Lock()
+        self.decode_lock = threading.Lock()
+
+    def feed(self, frame: bytes):
+        """Accepts one PCM s16le mono 16 kHz (or Opus) frame. Cheap, decoding happens in decode_pending."""
+        if self.decoder:
+            try:
+                frame = self.decoder.decode(frame, OPUS_MAX_FRAME_SAMPLES)
+            except Exception as e:
+                raise InvalidAudioError(f"Invalid Opus frame: {e}")
+        # WebSocket frames need not end on a sample boundary, an odd byte waits for the next frame
+        frame = self.remainder + frame
+        usable = len(frame) - len(frame) % 2
+        self.remainder = frame[usable:]
+        samples = np.frombuffer(frame[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        self.audio_file.write(samples)
+        with self.buffer_lock:
+            self.buffer = np.concatenate([self.buffer, samples])
+            self.pending += len(samples)
+
+    def has_pending(self) -> bool:
+        return self.pending >= STEP_S * SAMPLE_RATE
+
+    def decode_pending(self) -> list:
+        """Decodes everything received since the last pass at once, returns partial/final events."""
+        with self.decode_lock:
+            with self.buffer_lock:
+                if self.closed or not self.has_pending():
+                    return []
+                self.pending = 0
+            return self.decode(final=False)
+
+    def close(self) -> list:
+        # Waits for a decode_pending pass that is still running
+        with self.decode_lock:
+            if self.closed:
+                return []
+            self.closed = True
+            events = []
+            try:
+                while len(self.buffer):
+                    events += self.decode(final=True)
+                return events
+            finally:
+                self.audio_file.close()
+
+    def decode(self, final: bool) -> list:
+        with self.buffer_lock:
+            buffer = self.buffer
+        if not len(buffer):
+            return []
+        duration = len(buffer) / SAMPLE_RATE
+        window = buffer[:int(WINDOW_S * SAMPLE_RATE)]
+        window_duration = len(window) / SAMPLE_RATE
+        segments = [(start, end if end is not None else window_duration, text)
+                    for start, end, text in transcribe_samples(window, SAMPLE_RATE)]
+
+        if final or duration >= WINDOW_S:
+            done = len(segments)
+        else:
+            done = 0
+            while done < len(segments) and segments[done][1] <= duration - FINALIZE_MARGIN_S:
+                done += 1
+            if duration > MAX_BUFFER_S:
+                done = max(done, len(segments) - 1)
+
+        events = []
+        with open(self.transcript_path, "a", encoding="utf-8") as f, \
+                open(self.timestamp_path, "a", encoding="utf-8") as ts_f:
+            for start, end, text in segments[:done]:
+                start, end = start + self.buffer_start, end + self.buffer_start
+                f.write(text)
+                ts_f.write(f"[{start:.2f} - {end:.2f}]: {text}\n")
+                events.append({"type": "final", "start": round(start, 2), "end": round(end, 2), "text": text.strip()})
+
+        # Drop finalized audio; audio without any segments is dropped as silence past MAX_BUFFER_S
+        if final or duration >= WINDOW_S or (not segments and duration > MAX_BUFFER_S):
+            cut = window_duration
+        else:
+            cut = segments[done - 1][1] if done else 0.0
+        with self.buffer_lock:
+            # Only the head is cut, frames appended during the decode stay in the buffer
+            self.buffer = self.buffer[int(cut * SAMPLE_RATE):]
+        self.buffer_start += cut
+
+        if not final:
+            partial = "".join(text for _, _, text in segments[done:]).strip()
+            events.append({"type": "partial", "start": round(self.buffer_start, 2), "text": partial})
+        return events
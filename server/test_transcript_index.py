@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+
+from transcript_index import (merge_timestamp_chunks, find_byte_range, iter_file_range, StaleIndexError,
+                              INDEX_HEADER)
+
+
+def write_chunk(tmp_path, name, lines, seconds=None):
+    timestamp_path = tmp_path / f"{name}.timestamp.txt"
+    timestamp_path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    audio_path = None
+    if seconds is not None:
+        audio_path = tmp_path / f"{name}.wav"
+        sf.write(audio_path, np.zeros(int(seconds * 16000), dtype=np.float32), 16000)
+    return str(timestamp_path), str(audio_path) if audio_path else None
+
+
+@pytest.fixture
+def merged(tmp_path):
+    chunks = [
+        write_chunk(tmp_path, "chunk_000000", ["[0.00 - 10.00]: a", "[10.00 - 28.00]: b"], seconds=30),
+        # No audio: the next chunk is shifted by the last segment end instead
+        write_chunk(tmp_path, "chunk_000001", ["[0.00 - 5.00]: c", "continued", "[5.00 - 29.00]: d"]),
+        write_chunk(tmp_path, "chunk_000002", ["[1.00 - 2.00]: e"], seconds=30),
+    ]
+    output_path, index_path = str(tmp_path / "s.timestamp.txt"), str(tmp_path / "s.idx")
+    merge_timestamp_chunks(chunks, output_path, index_path)
+    return output_path, index_path
+
+
+def read_range(merged, start, end):
+    output_path, index_path = merged
+    transcript_file = open(output_path, "rb")
+    offset, length = find_byte_range(transcript_file, index_path, start, end)
+    return b"".join(iter_file_range(transcript_file, offset, length)).decode("utf-8")
+
+
+def test_merge_offsets_segments_by_chunk_duration(merged):
+    with open(merged[0], encoding="utf-8") as f:
+        assert f.read() == ("[0.00 - 10.00]: a\n"
+                            "[10.00 - 28.00]: b\n"
+                            "[30.00 - 35.00]: c\n"
+                            "continued\n"
+                            "[35.00 - 59.00]: d\n"
+                            "[60.00 - 61.00]: e\n")
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    (None, None, "abcde"),
+    (12, 31, "bc"),
+    (10, 30, "b"),  # [start, end): a ends at 10, c starts at 30
+    (29, 30, ""),
+    (40, None, "de"),
+    (None, 10, "a"),
+    (100, None, ""),
+])
+def test_range_boundaries(merged, start, end, expected):
+    text = read_range(merged, start, end)
+    assert "".join(line[-1] for line in text.splitlines() if line.startswith("[")) == expected
+
+
+def test_range_keeps_continuation_lines(merged):
+    assert read_range(merged, 31, 34) == "[30.00 - 35.00]: c\ncontinued\n"
+
+
+def test_index_for_another_transcript_is_rejected(merged):
+    output_path, index_path = merged
+    with open(index_path, "r+b") as f:
+        f.write(INDEX_HEADER.pack(1))
+    with open(output_path, "rb") as transcript_file:
+        with pytest.raises(StaleIndexError):
+            find_byte_range(transcript_file, index_path, 0, 10)
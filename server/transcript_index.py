@@ -0,0 +1,117 @@
+import bisect
+import os
+import re
+import struct
+
+import soundfile as sf
+
+# "[12.34 - 15.67]: text" — формат строк, который пишет task_0.transcribe_audio
+TIMESTAMP_LINE = re.compile(r"^\[(\d+(?:\.\d+)?) - (\d+(?:\.\d+)?)\]:(.*)$")
+
+# Header: size of the .timestamp.txt the index was built for, so a reader can tell it holds the matching pair
+INDEX_HEADER = struct.Struct("<Q")
+# One fixed-size record per segment: global start, global end, byte offset in the .timestamp.txt file
+INDEX_RECORD = struct.Struct("<ddQ")
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class StaleIndexError(Exception):
+    """The index does not belong to the transcript file that was opened (a re-merge is in progress)."""
+
+
+def index_path_for(timestamp_path: str) -> str:
+    return os.path.splitext(timestamp_path)[0] + ".idx"
+
+
+def audio_duration(audio_path: str | None) -> float | None:
+    if not audio_path or not os.path.exists(audio_path):
+        return None
+    try:
+        return sf.info(audio_path).duration
+    except Exception as e:
+        print(f"Could not read duration of {audio_path}: {e}")
+        return None
+
+
+def merge_timestamp_chunks(chunks: list, output_path: str, index_path: str):
+    """Merges per-chunk timestamp files onto a global timeline and writes the segment index.
+
+    `chunks` is an ordered list of (timestamp_path, audio_path) pairs. Every chunk restarts at 0 s,
+    so its segments are shifted by the summed duration of the preceding chunks.
+    """
+    # Readers may pair the index with the transcript at any moment: write both aside, swap index last
+    output_tmp, index_tmp = output_path + ".tmp", index_path + ".tmp"
+    chunk_offset = 0.0
+    with open(output_tmp, "wb") as outfile, open(index_tmp, "wb") as index_file:
+        index_file.write(INDEX_HEADER.pack(0))
+        for timestamp_path, audio_path in chunks:
+            last_end = 0.0
+            if os.path.exists(timestamp_path):
+                with open(timestamp_path, "r", encoding="utf-8") as infile:
+                    for line in infile:
+                        line = line.rstrip("\n")
+                        if not line:
+                            continue
+                        match = TIMESTAMP_LINE.match(line)
+                        if not match:
+                            # Продолжение текста предыдущего сегмента
+                            outfile.write((line + "\n").encode("utf-8"))
+                            continue
+                        start = float(match.group(1)) + chunk_offset
+                        end = float(match.group(2)) + chunk_offset
+                        last_end = max(last_end, float(match.group(2)))
+                        index_file.write(INDEX_RECORD.pack(start, end, outfile.tell()))
+                        outfile.write(f"[{start:.2f} - {end:.2f}]:{match.group(3)}\n".encode("utf-8"))
+
+            # Fall back to the last segment end when the chunk audio is gone
+            duration = audio_duration(audio_path)
+            chunk_offset += duration if duration is not None else last_end
+
+        index_file.seek(0)
+        index_file.write(INDEX_HEADER.pack(outfile.tell()))
+
+    os.replace(output_tmp, output_path)
+    os.replace(index_tmp, index_path)
+
+
+def find_byte_range(transcript_file, index_path: str, start: float | None, end: float | None) -> tuple:
+    """Returns (offset, length) of the segments overlapping [start, end) in the opened timestamp file.
+
+    The transcript must be opened before this call and read through the same handle: a re-merge
+    replaces the files, and the size check below only holds for the handle it was made on.
+    """
+    with open(index_path, "rb") as f:
+        data = f.read()
+    if len(data) < INDEX_HEADER.size or (len(data) - INDEX_HEADER.size) % INDEX_RECORD.size:
+        raise StaleIndexError(f"Malformed index {index_path}")
+    file_size = os.fstat(transcript_file.fileno()).st_size
+    if INDEX_HEADER.unpack_from(data)[0] != file_size:
+        raise StaleIndexError(f"Index {index_path} does not match the transcript")
+    records = list(INDEX_RECORD.iter_unpack(data[INDEX_HEADER.size:]))
+    if not records:
+        return 0, 0
+
+    starts = [r[0] for r in records]
+    ends = [r[1] for r in records]
+    first = bisect.bisect_right(ends, start) if start is not None else 0
+    last = bisect.bisect_left(starts, end) if end is not None else len(records)
+    if first >= last:
+        return 0, 0
+
+    offset = records[first][2]
+    stop = records[last][2] if last < len(records) else file_size
+    return offset, stop - offset
+
+
+def iter_file_range(transcript_file, offset: int, length: int):
+    """Yields `length` bytes from `offset` of an opened file and closes it."""
+    with transcript_file:
+        transcript_file.seek(offset)
+        remaining = length
+        while remaining > 0:
+            block = transcript_file.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
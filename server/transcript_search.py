@@ -0,0 +1,143 @@
+import json
+import math
+import os
+import re
+from collections import Counter, OrderedDict
+
+from keys import UPLOAD_DIR
+from transcript_index import TIMESTAMP_LINE
+
+# Consecutive segments are grouped into passages of about this many words
+PASSAGE_WORDS = 80
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+WORD = re.compile(r"\w+", re.UNICODE)
+# Terms are cut to this many characters: a crude stemmer aimed at Russian inflection, where word forms
+# mostly differ in the ending ("задачи"/"задачами"/"задача" -> "задач", "решения"/"решение" -> "решен").
+# In English it only merges forms that share 5 letters ("decisions"/"decision", not "decided").
+# None keeps whole words
+TERM_PREFIX = 5
+
+# session_id -> (mtime, index), чтобы не читать индекс с диска на каждое сообщение; LRU по сессиям
+MAX_LOADED_INDEXES = 4
+loaded_indexes = OrderedDict()
+
+
+def search_index_path(session_id: str) -> str:
+    return os.path.join(UPLOAD_DIR, f"{session_id}_search.json")
+
+
+def tokenize(text: str, term_prefix: int | None = TERM_PREFIX) -> list:
+    words = WORD.findall(text.lower())
+    return [word[:term_prefix] for word in words] if term_prefix else words
+
+
+def read_segments(timestamp_path: str) -> list:
+    segments = []
+    with open(timestamp_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            match = TIMESTAMP_LINE.match(line)
+            if match:
+                segments.append([float(match.group(1)), float(match.group(2)), match.group(3).strip()])
+            elif line and segments:
+                segments[-1][2] += " " + line
+    return segments
+
+
+def build_search_index(session_id: str, timestamp_path: str, term_prefix: int | None = TERM_PREFIX):
+    """Builds the BM25 index over timestamped passages of the merged transcript."""
+    passages = []
+    current = None
+    for start, end, text in read_segments(timestamp_path):
+        if current is None:
+            current = [start, end, text]
+        else:
+            current[1] = end
+            current[2] += " " + text
+        if len(tokenize(current[2])) >= PASSAGE_WORDS:
+            passages.append(current)
+            current = None
+    if current is not None:
+        passages.append(current)
+
+    postings = {}
+    lengths = []
+    for i, (_, _, text) in enumerate(passages):
+        terms = tokenize(text, term_prefix)
+        lengths.append(len(terms))
+        for term, tf in Counter(terms).items():
+            postings.setdefault(term, []).append([i, tf])
+
+    # The chat may be reading the index: write it aside and swap it in
+    path = search_index_path(session_id)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"passages": passages, "lengths": lengths, "postings": postings, "term_prefix": term_prefix},
+                  f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def load_search_index(session_id: str):
+    path = search_index_path(session_id)
+    try:
+        mtime = os.path.getmtime(path)
+        cached = loaded_indexes.get(session_id)
+        if cached and cached[0] == mtime:
+            loaded_indexes.move_to_end(session_id)
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        # Без индекса чат просто отвечает без контекста встречи
+        print(f"Search index load failed for {session_id}: {e}")
+        return None
+    loaded_indexes[session_id] = (mtime, index)
+    loaded_indexes.move_to_end(session_id)
+    while len(loaded_indexes) > MAX_LOADED_INDEXES:
+        loaded_indexes.popitem(last=False)
+    return index
+
+
+def search(index: dict, query: str, top_k: int) -> list:
+    """Returns up to top_k passages [start, end, text] ranked by BM25."""
+    lengths = index["lengths"]
+    if not lengths:
+        return []
+    avg_length = sum(lengths) / len(lengths)
+    scores = Counter()
+    # Queries are normalized exactly like the index was
+    for term in set(tokenize(query, index.get("term_prefix"))):
+        postings = index["postings"].get(term)
+        if not postings:
+            continue
+        idf = math.log(1 + (len(lengths) - len(postings) + 0.5) / (len(postings) + 0.5))
+        for i, tf in postings:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[i] / avg_length)
+            scores[i] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+    return [index["passages"][i] for i, _ in scores.most_common(top_k)]
+
+
+def format_timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def retrieve_context(session_id: str, query: str, count_tokens, token_budget: int, top_k: int) -> str:
+    """Top-k relevant passages of the session transcript that fit into token_budget, in meeting order."""
+    index = load_search_index(session_id)
+    if not index:
+        return ""
+    selected = []
+    used = 0
+    for passage in search(index, query, top_k):
+        start, end, text = passage
+        tokens = count_tokens(f"[{format_timestamp(start)} - {format_timestamp(end)}] {text}\n")
+        if used + tokens > token_budget:
+            continue
+        selected.append(passage)
+        used += tokens
+    return "".join(f"[{format_timestamp(start)} - {format_timestamp(end)}] {text}\n"
+                   for start, end, text in sorted(selected))